@@ -5,13 +5,14 @@ from geventwebsocket.handler import WebSocketHandler
 import os
 from dotenv import load_dotenv
 from src.utils.logger import logger
+from src.utils import fast_json
 
 load_dotenv()
 
 def create_app():
 
     app = Flask(__name__)
-    socket = SocketIO(app, cors_allowed_origins="*", async_mode='gevent')
+    socket = SocketIO(app, cors_allowed_origins="*", async_mode='gevent', json=fast_json)
 
     from src.app.main import deploy_main_routes
     deploy_main_routes(socket)
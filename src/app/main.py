@@ -2,6 +2,7 @@ from flask import request
 from flask_socketio import emit
 from src.utils.logger import logger
 from src.components.trader import Trader
+from src.lib.trade_snapshot import TradeSnapshot
 
 trader = Trader()
 
@@ -47,7 +48,7 @@ def deploy_main_routes(socketio):
     def trades():
         try:
             logger.announcement("Trades requested.", 'info')
-            trades = [trade.to_dict() for trade in trader.trades]
+            trades = TradeSnapshot.many_to_records(trader.trades)
             emit('trades_data', trades, broadcast=True)
         except Exception as e:
             logger.error(f"Error getting trades: {str(e)}")
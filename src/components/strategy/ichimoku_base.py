@@ -2,9 +2,166 @@ from src.lib.params import BaseStrategyParams, ContractData
 from src.lib.strategy import Strategy
 from src.utils.logger import logger
 import numpy as np
+import logging
 from typing import Dict, Any, List
 from ib_insync import *
 from src.lib.trade_snapshot import TradeSnapshot
+from src.utils.jit import njit
+from src.lib.candles import Candles
+from concurrent.futures import ProcessPoolExecutor
+import os
+
+try:
+    import talib
+    _HAS_TALIB = True
+except ImportError:
+    _HAS_TALIB = False
+
+# TA-Lib seeds the first bars and clamps reversals slightly differently from
+# `_calculate_psar`, so its C implementation is opt-in rather than automatic.
+USE_TALIB_SAR = os.getenv('USE_TALIB_SAR', 'false').lower() in ('true', '1', 'yes')
+
+# Take-profit / add-on levels as fractions of the PSAR flip jump
+TP1_MULT = 0.382
+TP2_MULT = 0.618
+ADDON_CAP_MULT = 0.5
+# Contracts per initial entry, and how many of them the TP1 child order takes
+ENTRY_QTY = 12
+TP1_QTY = 6
+
+
+# Kernels used by run() carry explicit signatures so they are compiled (or loaded
+# from the on-disk cache) at import time instead of on the first live bar
+@njit('Tuple((boolean, float64, float64, float64))(float64[:], float64[:], float64)', cache=True)
+def _psar_seed(high, low, step):
+    """Initial (trend_up, ep, sar, af) of the PSAR recurrence; `sar` is also the first PSAR value."""
+    # Initial trend assumption: use first two closes to decide
+    trend_up = True  # default
+    if high.shape[0] >= 2:
+        trend_up = high[1] >= high[0]  # crude proxy
+
+    # Initial Extreme Point (EP) and SAR
+    ep = high[0] if trend_up else low[0]
+    sar = low[0] if trend_up else high[0]
+    return trend_up, ep, sar, step
+
+
+@njit('Tuple((boolean, float64, float64, float64))(float64[:], float64[:], float64[:], int64, '
+      'boolean, float64, float64, float64, float64, float64)', cache=True)
+def _psar_resume(high, low, psar, start, trend_up, ep, sar, af, step, max_step):
+    """Continue the Parabolic SAR recurrence from bar `start`, writing `psar[start:len(high)]`.
+
+    Every bar depends on the previous SAR, extreme point and acceleration factor,
+    so this stays a sequential loop; min / max are spelled out as comparisons
+    in the same order as the builtin min() / max() calls they replace. Returns
+    the (trend_up, ep, sar, af) state after the last bar so a series grown by
+    one bar can be extended without starting over.
+    """
+    for i in range(start, high.shape[0]):
+        # 1) Calculate next SAR value
+        sar = sar + af * (ep - sar)
+
+        # 2) In uptrend, SAR cannot be above prior two lows
+        if trend_up:
+            if low[i - 1] < sar:
+                sar = low[i - 1]
+            if i >= 2 and low[i - 2] < sar:
+                sar = low[i - 2]
+        else:  # downtrend: SAR cannot be below prior two highs
+            if high[i - 1] > sar:
+                sar = high[i - 1]
+            if i >= 2 and high[i - 2] > sar:
+                sar = high[i - 2]
+
+        # 3) Check for trend switch
+        if trend_up:
+            if low[i] < sar:
+                trend_up = False
+                sar = ep  # On reversal, SAR is set to previous EP
+                ep = low[i]
+                af = step
+        else:
+            if high[i] > sar:
+                trend_up = True
+                sar = ep
+                ep = high[i]
+                af = step
+
+        # 4) Update EP & AF
+        if trend_up:
+            if high[i] > ep:
+                ep = high[i]
+                af = af + step if af + step <= max_step else max_step
+        else:
+            if low[i] < ep:
+                ep = low[i]
+                af = af + step if af + step <= max_step else max_step
+
+        psar[i] = sar
+
+    return trend_up, ep, sar, af
+
+
+@njit('float64[:](float64[:], float64[:], float64, float64)', cache=True)
+def _psar_loop(high, low, step, max_step):
+    """Parabolic SAR over float64 high / low arrays"""
+    n = high.shape[0]
+    psar = np.empty(n, dtype=np.float64)
+    if n == 0:
+        return psar
+    trend_up, ep, sar, af = _psar_seed(high, low, step)
+    psar[0] = sar
+    _psar_resume(high, low, psar, 1, trend_up, ep, sar, af, step, max_step)
+    return psar
+
+
+@njit('Tuple((boolean[:], float64[:], float64[:]))(float64[:], float64[:], float64[:], float64[:])', cache=True)
+def _psar_trend_scan(psar, high, low, close):
+    """Single pass over a PSAR series: flip flags and the extremes of the current trend.
+
+    A bar is flipped when its PSAR side (at/above the close = bearish) differs from
+    the previous bar's. The running high / low restart at every flip, matching
+    `max_high_since_start` / `min_low_since_start` as run() maintains them.
+    The flip is the XOR of consecutive sides and only selects which running value
+    the bar extends, so the loop body has no data-dependent branch.
+    """
+    n = psar.shape[0]
+    flipped = np.zeros(n, dtype=np.bool_)
+    max_high = np.empty(n, dtype=np.float64)
+    min_low = np.empty(n, dtype=np.float64)
+    if n == 0:
+        return flipped, max_high, min_low
+    max_high[0] = high[0]
+    min_low[0] = low[0]
+    prev_bearish = psar[0] >= close[0]
+    for i in range(1, n):
+        bearish = psar[i] >= close[i]
+        flip = bearish ^ prev_bearish
+        flipped[i] = flip
+        # A flip restarts the extremes at this bar's own high / low
+        run_high = high[i] if flip else max_high[i - 1]
+        run_low = low[i] if flip else min_low[i - 1]
+        max_high[i] = high[i] if high[i] > run_high else run_high
+        min_low[i] = low[i] if low[i] < run_low else run_low
+        prev_bearish = bearish
+    return flipped, max_high, min_low
+
+# Candles shared by every backtest in a sweep, set once per worker process
+_sweep_candles = None
+
+
+def _init_sweep_worker(candles: Candles):
+    global _sweep_candles
+    _sweep_candles = candles
+
+
+def _sweep_backtest(psar_params: Dict[str, float]):
+    """Backtest a fresh IchimokuBase over the worker's candles with the given PSAR parameters"""
+    strategy = IchimokuBase(IchimokuBaseParams())
+    strategy.psar_step = psar_params.get('step', strategy.psar_step)
+    strategy.psar_max_step = psar_params.get('max_step', strategy.psar_max_step)
+    strategy.params.contracts[0].data = _sweep_candles
+    return strategy.backtest()
 
 class IchimokuBaseParams(BaseStrategyParams):
     """Parameters container for the Ichimoku (PSAR-based) strategy"""
@@ -37,6 +194,9 @@ class IchimokuBase(Strategy):
         self.name = 'ICHIMOKU_BASE'
         self.timeframe = '1 day'
         self.timeframe_seconds = 86400
+        # Parabolic SAR acceleration step and cap
+        self.psar_step = 0.02
+        self.psar_max_step = 0.2
         # Internal state tracking
         self._prev_psar_sign = None  # +1 => bearish, -1 => bullish
         # New: attributes for full trend tracking
@@ -52,82 +212,87 @@ class IchimokuBase(Strategy):
         self.tp1_level = None
         self.tp2_level = None
         self.tp1_hit = False
+        # Add-on ceiling (50% of the flip jump), computed with the TP levels
+        self.addon_cap_level = None
+        # PSAR over the whole replayed series, set by backtest(). PSAR is causal, so
+        # its first k values equal the PSAR of the first k bars.
+        self._psar_full = None
+        # Running high / low since the latest flip for the same series (see `_psar_trend_scan`)
+        self._trend_extremes = None
+        # PSAR recurrence state carried between live run() calls so that a series grown by
+        # one bar only costs one more step instead of a full recomputation
+        self._psar_state = None
 
     # ---------------------------------------------------------------------
     # Utility helpers
     # ---------------------------------------------------------------------
     @staticmethod
-    def _calculate_psar(high: List[float], low: List[float], step: float = 0.02, max_step: float = 0.2) -> List[float]:
+    def _calculate_psar(high: np.ndarray, low: np.ndarray, step: float = 0.02, max_step: float = 0.2) -> np.ndarray:
         """Return full Parabolic SAR series for the given high and low arrays.
 
-        This is a pure-python implementation adapted from commonly used formulas. It
-        should be sufficient for daily data sizes (< 10k bars). For production use
-        you may prefer TA-Lib or pandas_ta for speed and reliability.
+        The recurrence runs in `_psar_loop`, compiled with Numba when it is
+        installed. When TA-Lib is installed and USE_TALIB_SAR is set, `talib.SAR`
+        is used instead for the default step / max step.
         """
         if len(high) != len(low):
             raise ValueError("High and Low arrays must be the same length")
 
-        n = len(high)
-        psar = [np.nan] * n
-
-        # Initial trend assumption: use first two closes to decide
-        trend_up = True  # default
-        if n >= 2:
-            trend_up = high[1] >= high[0]  # crude proxy
-
-        # Initial Extreme Point (EP) and SAR
-        ep = high[0] if trend_up else low[0]
-        sar = low[0] if trend_up else high[0]
-        af = step
-
-        psar[0] = sar
-
-        for i in range(1, n):
-            # 1) Calculate next SAR value
-            sar = sar + af * (ep - sar)
-
-            # 2) In uptrend, SAR cannot be above prior two lows
-            if trend_up:
-                if i >= 2:
-                    sar = min(sar, low[i - 1], low[i - 2])
-                elif i == 1:
-                    sar = min(sar, low[i - 1])
-            else:  # downtrend: SAR cannot be below prior two highs
-                if i >= 2:
-                    sar = max(sar, high[i - 1], high[i - 2])
-                elif i == 1:
-                    sar = max(sar, high[i - 1])
-
-            # 3) Check for trend switch
-            reversed_ = False
-            if trend_up:
-                if low[i] < sar:
-                    trend_up = False
-                    sar = ep  # On reversal, SAR is set to previous EP
-                    ep = low[i]
-                    af = step
-                    reversed_ = True
-            else:
-                if high[i] > sar:
-                    trend_up = True
-                    sar = ep
-                    ep = high[i]
-                    af = step
-                    reversed_ = True
-
-            # 4) Update EP & AF
-            if trend_up:
-                if high[i] > ep:
-                    ep = high[i]
-                    af = min(af + step, max_step)
-            else:
-                if low[i] < ep:
-                    ep = low[i]
-                    af = min(af + step, max_step)
-
-            psar[i] = sar
+        high = np.asarray(high, dtype=np.float64)
+        low = np.asarray(low, dtype=np.float64)
+        if _HAS_TALIB and USE_TALIB_SAR and step == 0.02 and max_step == 0.2:
+            return talib.SAR(high, low, acceleration=step, maximum=max_step)
 
-        return psar
+        return _psar_loop(high, low, step, max_step)
+
+    def _update_psar(self, candles: Candles, n: int) -> np.ndarray:
+        """Return the PSAR series for the first `n` bars, extending the cached series when possible.
+
+        The last bar of a live refresh may still be forming and come back revised on the
+        next call, so the recurrence state is kept as of the bar before it and the last
+        one or two bars are re-stepped every time. The cache is only reused when the
+        series kept its length or grew by one bar, with the same first bar, the same
+        checkpoint bar and the same PSAR parameters; anything else (a rolled history
+        window, a revised older bar) recomputes from the first bar.
+        """
+        highs, lows = candles.high, candles.low
+        params = (self.psar_step, self.psar_max_step)
+        if _HAS_TALIB and USE_TALIB_SAR:
+            return self._calculate_psar(highs[:n], lows[:n], *params)
+
+        state = self._psar_state
+        if (state is not None and state['length'] >= 3 and state['length'] <= n <= state['length'] + 1
+                and state['params'] == params and candles.date[0] == state['first_date']):
+            k = state['length'] - 2
+            reusable = (candles.date[k], highs[k], lows[k]) == state['checkpoint_bar']
+        else:
+            reusable = False
+
+        if reusable:
+            if n > len(state['buffer']):
+                state['buffer'] = np.concatenate((state['buffer'], np.empty_like(state['buffer'])))
+            buffer, checkpoint = state['buffer'], state['checkpoint']
+            start = k + 1
+        else:
+            buffer = np.empty(2 * n, dtype=np.float64)
+            trend_up, ep, sar, af = _psar_seed(highs[:n], lows[:n], self.psar_step)
+            buffer[0] = sar
+            checkpoint = (trend_up, ep, sar, af)
+            start = 1
+            state = self._psar_state = {
+                'buffer': buffer,
+                'params': params,
+                'first_date': candles.date[0],
+            }
+
+        # Step up to the bar before the last one and keep that as the next checkpoint,
+        # then step the (possibly still forming) last bar on top of it
+        k = max(n - 2, 0)
+        checkpoint = _psar_resume(highs[:k + 1], lows[:k + 1], buffer, start, *checkpoint, *params)
+        _psar_resume(highs[:n], lows[:n], buffer, max(k + 1, 1), *checkpoint, *params)
+        state['checkpoint'] = checkpoint
+        state['checkpoint_bar'] = (candles.date[k], highs[k], lows[k])
+        state['length'] = n
+        return buffer[:n]
 
     # ------------------------------------------------------------------
     def to_dict(self):
@@ -145,7 +310,7 @@ class IchimokuBase(Strategy):
         logger.info("Refreshing strategy params (Ichimoku Base)...")
         self.params.open_orders = data_manager.get_open_orders()
         self.params.executed_orders = data_manager.get_completed_orders()
-        self.params.positions = data_manager.get_positions()
+        self.set_positions(data_manager.get_positions())
         # Fetch 6 months of daily data as a starting point
         self.params.contracts[0].data = data_manager.get_historical_data(
             self.params.contracts[0].contract, duration='1 Y', bar_size=self.timeframe
@@ -160,15 +325,19 @@ class IchimokuBase(Strategy):
         logger.announcement('Executing Ichimoku Base strategy...', 'info')
         main_contract = self.params.contracts[0]
 
-        if not main_contract or len(main_contract.data) < 5:
+        n = main_contract.length if main_contract else 0
+        if n < 5:
             logger.warning('Not enough data to evaluate strategy')
             return 'STAY'
 
-        highs = [d['high'] for d in main_contract.data]
-        lows = [d['low'] for d in main_contract.data]
-        closes = [d['close'] for d in main_contract.data]
+        highs = main_contract.data.high[:n]
+        lows = main_contract.data.low[:n]
+        closes = main_contract.data.close[:n]
 
-        psar_series = self._calculate_psar(highs, lows)
+        if self._psar_full is not None:
+            psar_series = self._psar_full[:n]
+        else:
+            psar_series = self._update_psar(main_contract.data, n)
         main_contract.indicators['psar'] = psar_series
         self.params.indicators['psar'] = psar_series[-1]
 
@@ -178,13 +347,15 @@ class IchimokuBase(Strategy):
         latest_close = closes[-1]
         prev_close = closes[-2]
 
-        latest_sign = -1 if latest_psar < latest_close else 1  # -1 bullish, +1 bearish
-        prev_sign = -1 if prev_psar < prev_close else 1
+        # Only the last two bars matter here, so compare the scalars directly
+        latest_sign = 1 if latest_psar >= latest_close else -1  # -1 bullish, +1 bearish
+        prev_sign = 1 if prev_psar >= prev_close else -1
+        flipped = latest_sign != prev_sign
 
         # --------------------------------------------------------------
         # Update internal trend state
         # --------------------------------------------------------------
-        if latest_sign != prev_sign:
+        if flipped:
             # A flip occurred – define new trend baseline
             self.trend_direction = 'long' if latest_sign == -1 else 'short'
             self.trend_start_idx = len(psar_series) - 1
@@ -192,13 +363,11 @@ class IchimokuBase(Strategy):
             self.last_prev_psar = prev_psar
             self.first_psar = latest_psar
             self.diff = abs(self.last_prev_psar - self.first_psar)
-            # Compute TP levels
-            if self.trend_direction == 'long':
-                self.tp1_level = self.last_prev_psar + 0.382 * self.diff
-                self.tp2_level = self.last_prev_psar + 0.618 * self.diff
-            else:
-                self.tp1_level = self.last_prev_psar - 0.382 * self.diff
-                self.tp2_level = self.last_prev_psar - 0.618 * self.diff
+            # Compute TP / add-on levels once per trend; run() and create_orders() share them
+            side = 1 if self.trend_direction == 'long' else -1
+            self.tp1_level = self.last_prev_psar + side * TP1_MULT * self.diff
+            self.tp2_level = self.last_prev_psar + side * TP2_MULT * self.diff
+            self.addon_cap_level = self.last_prev_psar + side * ADDON_CAP_MULT * self.diff
             self.tp1_hit = False
             # Reset extremes
             self.max_high_since_start = highs[-1]
@@ -214,14 +383,20 @@ class IchimokuBase(Strategy):
                     min(self.min_low_since_start, lows[-1]) if self.min_low_since_start is not None else lows[-1]
                 )
 
-        logger.info(
-            f"Prev sign: {prev_sign}, Latest sign: {latest_sign}, Prev PSAR: {prev_psar:.2f}, "
-            f"Latest PSAR: {latest_psar:.2f}, Latest close: {latest_close:.2f}, Trend: {self.trend_direction}, "
-            f"Candle# {self.candle_count}"
-        )
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                f"Prev sign: {prev_sign}, Latest sign: {latest_sign}, Prev PSAR: {prev_psar:.2f}, "
+                f"Latest PSAR: {latest_psar:.2f}, Latest close: {latest_close:.2f}, Trend: {self.trend_direction}, "
+                f"Candle# {self.candle_count}"
+            )
 
         has_position = self.has_open_position()
 
+        # Flat and no fresh flip: no SL / TP / entry / add-on rule can fire
+        if not has_position and not flipped:
+            logger.info('No position and no PSAR flip -> STAY')
+            return 'STAY'
+
         # --------------------------------------------------------------
         # Stop-loss exit using PSAR as trailing level
         # --------------------------------------------------------------
@@ -278,7 +453,7 @@ class IchimokuBase(Strategy):
         # --------------------------------------------------------------
         # Primary entry signals (flip-based)
         # --------------------------------------------------------------
-        if not has_position:
+        if not has_position and flipped:
             if prev_sign == 1 and latest_sign == -1:
                 logger.warning('PSAR flip to bullish detected -> LONG')
                 return 'LONG'
@@ -295,18 +470,18 @@ class IchimokuBase(Strategy):
             # LONG add-on conditions
             if position_dir == 'long' and self.trend_direction == 'long':
                 cond_price = latest_close > self.last_prev_psar
-                cond_high_max = self.max_high_since_start < (self.last_prev_psar + 0.5 * self.diff)
+                cond_high_max = self.max_high_since_start < self.addon_cap_level
                 if cond_price and cond_high_max:
-                    add_qty = 12 if latest_close < (self.last_prev_psar + 0.382 * self.diff) else 6
+                    add_qty = 12 if latest_close < self.tp1_level else 6
                     logger.warning(f'Add-on LONG signal ({add_qty} contracts)')
                     return f'ADD_LONG_{add_qty}'
 
             # SHORT add-on conditions
             if position_dir == 'short' and self.trend_direction == 'short':
                 cond_price = latest_close < self.last_prev_psar
-                cond_low_min = self.min_low_since_start > (self.last_prev_psar - 0.5 * self.diff)
+                cond_low_min = self.min_low_since_start > self.addon_cap_level
                 if cond_price and cond_low_min:
-                    add_qty = 12 if latest_close > (self.last_prev_psar - 0.382 * self.diff) else 6
+                    add_qty = 12 if latest_close > self.tp1_level else 6
                     logger.warning(f'Add-on SHORT signal ({add_qty} contracts)')
                     return f'ADD_SHORT_{add_qty}'
 
@@ -322,82 +497,161 @@ class IchimokuBase(Strategy):
         """Enhanced backtest supporting add-ons, TP & SL partial exits."""
         self.params.open_orders = []
         self.params.executed_orders = []
-        self.params.positions = []  # List[dict]: {'qty':int,'side':str,'entry_price':float,'tp1_hit':bool}
+        self.set_positions([])  # List[dict]: {'position': int}
 
-        full_historical_data = self.params.contracts[0].data
+        main_contract = self.params.contracts[0]
+        full_historical_data = main_contract.data
         logger.info(f"Backtest will replay {len(full_historical_data)} candles (Ichimoku Base).")
 
         open_batches: List[TradeSnapshot] = []  # For tracking trade snapshots per batch
         completed_trades: List[TradeSnapshot] = []
-        decisions = []
-
-        for idx, candle in enumerate(full_historical_data):
-            if idx < 5:
-                continue
-
-            # Slice data up to current index
-            self.params.contracts[0].data = full_historical_data[: idx + 1]
-            decision = self.run()
-
-            current_date = candle.get('date')
-            current_close = candle.get('close')
-            decisions.append({'date': current_date.strftime('%Y%m%d') if current_date else str(idx), 'decision': decision})
-
-            # Helper to append snapshot and manage pos list
-            def open_batch(side: str, qty: int, price: float):
-                snap = TradeSnapshot(side=side.upper(), qty=qty, entry_date=current_date, entry_price=price)
-                open_batches.append(snap)
-                self.params.positions.append({'position': qty if side=='long' else -qty})
-
-            def close_batches(qty_to_close: int, price: float, reason: str):
-                remaining = qty_to_close
-                while remaining > 0 and open_batches:
-                    snap = open_batches[0]
-                    if snap.qty <= remaining:
-                        close_qty = snap.qty
-                        remaining -= close_qty
-                        snap.close(current_date, price, reason)
-                        completed_trades.append(snap)
-                        open_batches.pop(0)
-                    else:
-                        # Partial within snapshot
-                        part_snap = TradeSnapshot(side=snap.side, qty=remaining, entry_date=snap.entry_date, entry_price=snap.entry_price)
-                        part_snap.close(current_date, price, reason)
-                        completed_trades.append(part_snap)
-                        snap.qty -= remaining
-                        remaining = 0
-                # Update positions list
-                self.params.positions = [{'position': b.qty if b.side=='LONG' else -b.qty} for b in open_batches]
-
-            # Map decisions to actions
-            if decision == 'LONG':
-                entry_price = self.last_prev_psar if self.last_prev_psar is not None else current_close
-                open_batch('long', 12, entry_price)
-            elif decision == 'SHORT':
-                entry_price = self.last_prev_psar if self.last_prev_psar is not None else current_close
-                open_batch('short', 12, entry_price)
-            elif decision.startswith('ADD_LONG_'):
-                qty_add = int(decision.split('_')[-1])
-                open_batch('long', qty_add, current_close)
-            elif decision.startswith('ADD_SHORT_'):
-                qty_add = int(decision.split('_')[-1])
-                open_batch('short', qty_add, current_close)
-            elif decision.startswith('PARTIAL_EXIT_'):
-                qty_exit = int(decision.split('_')[-1])
-                close_price = self.tp1_level if self.tp1_level is not None else current_close
-                close_batches(qty_exit, close_price, 'TP1')
-            elif decision == 'EXIT':
-                total_qty = sum(b.qty for b in open_batches)
-                close_batches(total_qty, current_close, 'EXIT_SIGNAL')
+
+        # Extract the per-bar date / close once instead of building a bar dict every candle
+        dates = full_historical_data.date
+        closes = full_historical_data.close.tolist()
+        # Decision keys ('%Y%m%d', or the bar index when the date is missing), formatted once per series
+        day_keys = [d.strftime('%Y%m%d') if d else str(i) for i, d in enumerate(dates.tolist())]
+
+        # Compute PSAR once; each run() reads the prefix up to the visible cursor
+        highs, lows = full_historical_data.high, full_historical_data.low
+        psar_full = self._calculate_psar(highs, lows, self.psar_step, self.psar_max_step)
+
+        # While flat, run() can only act on a PSAR flip, so the stretches in between are
+        # replayed as whole segments. Flips and per-trend extremes come from one scan.
+        flipped, max_high, min_low = _psar_trend_scan(psar_full, highs, lows, full_historical_data.close)
+        flip_idx = np.flatnonzero(flipped)
+        n_bars = len(full_historical_data)
+        # One decision per bar, STAY unless run() says otherwise; records are built after the replay
+        bar_decisions = ['STAY'] * n_bars
+
+        # Helpers to open / close trade batches and keep the net position in step. Defined once
+        # per backtest rather than once per replayed bar.
+        def open_batch(side: str, qty: int, price: float, date):
+            snap = TradeSnapshot(side=side.upper(), qty=qty, entry_date=date, entry_price=price)
+            open_batches.append(snap)
+            self._position_state += qty if side=='long' else -qty
+
+        def close_batches(qty_to_close: int, price: float, reason: str, date):
+            remaining = qty_to_close
+            while remaining > 0 and open_batches:
+                snap = open_batches[0]
+                if snap.qty <= remaining:
+                    close_qty = snap.qty
+                    remaining -= close_qty
+                    snap.close(date, price, reason)
+                    completed_trades.append(snap)
+                    open_batches.pop(0)
+                else:
+                    # Partial within snapshot
+                    close_qty = remaining
+                    part_snap = TradeSnapshot(side=snap.side, qty=remaining, entry_date=snap.entry_date, entry_price=snap.entry_price)
+                    part_snap.close(date, price, reason)
+                    completed_trades.append(part_snap)
+                    snap.qty -= remaining
+                    remaining = 0
+                # Update net position
+                self._position_state -= close_qty if snap.side=='LONG' else -close_qty
+
+        # Replay-only state (net position, cursor, full-series PSAR) is only set inside the
+        # try, so it never outlives the replay, even when it fails; otherwise later live run()
+        # calls would keep reading it
+        try:
+            self._position_state = 0  # net position during the replay; positions are materialized at the end
+            self._psar_full = psar_full
+            self._trend_extremes = (max_high, min_low)
+            idx = 5
+            while idx < n_bars:
+                if not self.has_open_position():
+                    k = np.searchsorted(flip_idx, idx)
+                    end = int(flip_idx[k]) if k < len(flip_idx) else n_bars
+                    if end > idx:
+                        self._skip_flat_bars(idx, end)
+                        idx = end
+                        continue
+
+                # Expose data up to current index
+                main_contract.visible_len = idx + 1
+                # run()'s per-bar INFO chatter is noise in a replay; flips and exits still log
+                with logger.quiet():
+                    decision = self.run()
+
+                current_date = dates[idx]
+                current_close = closes[idx]
+                bar_decisions[idx] = decision
+
+                # Map decisions to actions
+                if decision == 'LONG':
+                    entry_price = self.last_prev_psar if self.last_prev_psar is not None else current_close
+                    open_batch('long', ENTRY_QTY, entry_price, current_date)
+                elif decision == 'SHORT':
+                    entry_price = self.last_prev_psar if self.last_prev_psar is not None else current_close
+                    open_batch('short', ENTRY_QTY, entry_price, current_date)
+                elif decision.startswith('ADD_LONG_'):
+                    qty_add = int(decision.split('_')[-1])
+                    open_batch('long', qty_add, current_close, current_date)
+                elif decision.startswith('ADD_SHORT_'):
+                    qty_add = int(decision.split('_')[-1])
+                    open_batch('short', qty_add, current_close, current_date)
+                elif decision.startswith('PARTIAL_EXIT_'):
+                    qty_exit = int(decision.split('_')[-1])
+                    close_price = self.tp1_level if self.tp1_level is not None else current_close
+                    close_batches(qty_exit, close_price, 'TP1', current_date)
+                elif decision == 'EXIT':
+                    total_qty = sum(b.qty for b in open_batches)
+                    close_batches(total_qty, current_close, 'EXIT_SIGNAL', current_date)
+
+                idx += 1
+        finally:
+            main_contract.visible_len = None
+            self._psar_full = None
+            self._trend_extremes = None
+            # Back to params.positions for has_open_position() / _get_position_direction()
+            self._position_state = None
+
+        # Positions still open when the data ends, one entry per batch
+        self.set_positions([{'position': b.qty if b.side=='LONG' else -b.qty} for b in open_batches])
 
         # Close remaining at end of data
         for snap in open_batches:
-            snap.close(full_historical_data[-1].get('date'), full_historical_data[-1].get('close'), 'END_OF_DATA')
+            snap.close(dates[-1], closes[-1], 'END_OF_DATA')
             completed_trades.append(snap)
 
+        decisions = [
+            {'date': key, 'decision': decision} for key, decision in zip(day_keys[5:], bar_decisions[5:])
+        ]
+
         logger.success(f"Backtest generated {len(completed_trades)} trades (Ichimoku Base).")
         return completed_trades, decisions
 
+    @staticmethod
+    def backtest_sweep(candles: Candles, grid: List[Dict[str, float]], max_workers: int = None):
+        """Backtest every PSAR parameter set in `grid` (dicts with 'step' / 'max_step') in parallel.
+
+        Each run uses its own strategy instance in a worker process; the candles are
+        sent to each worker once rather than with every task. Returns one
+        (trades, decisions) tuple per grid entry, in order.
+        """
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_sweep_worker, initargs=(candles,)) as pool:
+            return list(pool.map(_sweep_backtest, grid))
+
+    def _skip_flat_bars(self, start: int, end: int):
+        """Apply what run() does for bars `start`..`end - 1` when flat and without a PSAR flip.
+
+        Each such bar returns STAY and only extends the current trend: one more candle
+        and updated extremes, read from the precomputed running high / low at `end - 1`.
+        """
+        main_contract = self.params.contracts[0]
+        main_contract.indicators['psar'] = self._psar_full[:end]
+        self.params.indicators['psar'] = self._psar_full[end - 1]
+        if self.trend_direction is None:
+            return
+        # The current trend began at a flip that run() processed, so the scan's
+        # extremes restart at the same bar as the strategy's own
+        max_high, min_low = self._trend_extremes
+        self.candle_count += end - start
+        self.max_high_since_start = max_high[end - 1]
+        self.min_low_since_start = min_low[end - 1]
+
     # ------------------------------------------------------------------
     def create_orders(self, action: str):
         main_contract = self.params.contracts[0]
@@ -405,23 +659,21 @@ class IchimokuBase(Strategy):
             logger.error('No data available for order creation')
             return None
 
-        latest_data = main_contract.data[-1]
-        # Default quantities
-        default_entry_qty = 12
-
+        # Read the latest visible close straight from the column instead of building the bar dict
+        latest_close = float(main_contract.data.close[main_contract.length - 1])
         # Determine limit prices
-        price_psar_prev = self.last_prev_psar if self.last_prev_psar is not None else latest_data.get('close')
-        price_tp1 = self.tp1_level if self.tp1_level is not None else latest_data.get('close')
+        price_psar_prev = self.last_prev_psar if self.last_prev_psar is not None else latest_close
+        price_tp1 = self.tp1_level if self.tp1_level is not None else latest_close
 
         stop_price = self.params.indicators.get('psar') if isinstance(self.params.indicators, dict) else None
-        stop_price = stop_price if stop_price is not None else latest_data.get('close')
+        stop_price = stop_price if stop_price is not None else latest_close
 
         def bracket(side_parent: str, qty_parent: int, entry_price: float):
             opposite = 'SELL' if side_parent == 'BUY' else 'BUY'
             # Parent limit for entry
             parent = LimitOrder(action=side_parent, lmtPrice=round(entry_price,2), totalQuantity=qty_parent, transmit=False)
-            # TP1 child for first 6 contracts
-            tp1_qty = min(6, qty_parent)
+            # TP1 child for the first TP1_QTY contracts
+            tp1_qty = min(TP1_QTY, qty_parent)
             tp2_qty = qty_parent - tp1_qty
             take_profit1 = LimitOrder(action=opposite, lmtPrice=round(self.tp1_level,2), totalQuantity=tp1_qty, parentId=parent.orderId, transmit=False)
             # TP2 for remaining
@@ -431,16 +683,16 @@ class IchimokuBase(Strategy):
             return [parent, take_profit1, take_profit2, stop_order]
 
         if action == 'LONG':
-            return bracket('BUY', 12, price_psar_prev)
+            return bracket('BUY', ENTRY_QTY, price_psar_prev)
         if action == 'SHORT':
-            return bracket('SELL', 12, price_psar_prev)
+            return bracket('SELL', ENTRY_QTY, price_psar_prev)
 
         if action.startswith('ADD_LONG_'):
             qty_add = int(action.split('_')[-1])
-            return bracket('BUY', qty_add, latest_data.get('close'))
+            return bracket('BUY', qty_add, latest_close)
         if action.startswith('ADD_SHORT_'):
             qty_add = int(action.split('_')[-1])
-            return bracket('SELL', qty_add, latest_data.get('close'))
+            return bracket('SELL', qty_add, latest_close)
 
         if action.startswith('PARTIAL_EXIT_'):
             qty_exit = int(action.split('_')[-1])
@@ -458,11 +710,7 @@ class IchimokuBase(Strategy):
 
     # ------------------------------------------------------------------
     def _get_position_direction(self):
-        """Infer current position direction from params.positions list."""
-        for pos in getattr(self.params, 'positions', []):
-            size = pos.get('position', 0)
-            if size > 0:
-                return 'long'
-            elif size < 0:
-                return 'short'
-        return None
+        """Infer current position direction from params.positions (cached by set_positions())."""
+        if self._position_state is not None:
+            return 'long' if self._position_state > 0 else 'short' if self._position_state < 0 else None
+        return self._position_direction
@@ -2,9 +2,58 @@ from src.lib.params import BaseStrategyParams, ContractData
 from src.lib.strategy import Strategy
 from src.utils.logger import logger
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+import logging
 from ib_insync import *
-from typing import Dict, Any
+from typing import Dict, Any, Tuple
 from src.lib.trade_snapshot import TradeSnapshot
+from src.lib.candles import Candles
+from src.utils.jit import njit
+from concurrent.futures import ProcessPoolExecutor
+
+SMA_WINDOW = 50
+# First bar that may signal. The SMA-200 warm-up needs 201 price points (previous
+# close + current close), so run() and backtest() ignore crossovers before it
+WARMUP_BARS = 200
+DECISIONS = ('STAY', 'LONG', 'SHORT', 'EXIT')  # indexed by the kernel decision codes
+
+
+@njit('int8[:](int64[:], int64[:], int64)', cache=True)
+def _walk_crossovers(entry_idx, exit_idx, n):
+    """Alternate entry / exit crossover indices into one decision code per bar.
+
+    An entry only counts while flat and an exit only while in a position, so the
+    two sorted index arrays are merged with two pointers. Returns codes
+    (0 STAY, 1 LONG, 3 EXIT) for `n` bars.
+    """
+    codes = np.zeros(n, dtype=np.int8)
+    i = 0
+    j = 0
+    in_position = False
+    while True:
+        if not in_position:
+            if i >= entry_idx.shape[0]:
+                break
+            k = entry_idx[i]
+            codes[k] = 1
+            in_position = True
+            while j < exit_idx.shape[0] and exit_idx[j] <= k:
+                j += 1
+        else:
+            if j >= exit_idx.shape[0]:
+                break
+            k = exit_idx[j]
+            codes[k] = 3
+            in_position = False
+            while i < entry_idx.shape[0] and entry_idx[i] <= k:
+                i += 1
+    return codes
+
+
+def _batch_row_codes(closes: np.ndarray) -> np.ndarray:
+    """Decision codes for one row of `SMACrossover.batch_backtest`, run in a worker process"""
+    return SMACrossover._decision_codes(closes)[0]
+
 
 class SMACrossoverParams(BaseStrategyParams):
     """Parameters container for the SMA crossover strategy"""
@@ -32,6 +81,89 @@ class SMACrossover(Strategy):
         self.name = 'SMA Crossover'
         self.timeframe = '1 hour'
         self.timeframe_seconds = 3600
+        # Rolling SMA state carried between run() calls so that a series grown by
+        # one bar only costs an O(1) update instead of a full recomputation
+        self._sma_state = None
+
+    @staticmethod
+    def _calculate_sma(closes: np.ndarray, window: int) -> np.ndarray:
+        """Return the trailing SMA of `closes`, one value per bar.
+
+        The first `window - 1` bars average over the bars available so far. Full
+        windows are reduced in one `mean(axis=1)` over a strided view, which sums
+        each window like `np.mean` does instead of differencing a long cumulative
+        sum, so values do not drift as the series grows.
+        """
+        n = len(closes)
+        sma = np.empty(n, dtype=np.float64)
+        head = min(n, window - 1)
+        sma[:head] = [closes[:i].mean() for i in range(1, head + 1)]
+        if n >= window:
+            sliding_window_view(closes, window).mean(axis=1, out=sma[window - 1:])
+        return sma
+
+    def _update_sma(self, candles: Candles, n: int, window: int) -> np.ndarray:
+        """Return the SMA series for the first `n` bars, extending the cached series when possible.
+
+        Values live in a preallocated buffer written in place; the result is a view
+        of its first `n` entries, so no per-call list is built. The last bar of a live
+        refresh may still be forming, so the last two entries are always re-averaged
+        from their windows. Earlier entries are reused when the series kept its length
+        or grew by one bar and the last bar they cover is unchanged.
+        """
+        closes = candles.close
+        state = self._sma_state
+        reusable = False
+        if state is not None and state['length'] >= 3 and state['length'] <= n <= state['length'] + 1:
+            k = state['length'] - 2
+            reusable = (candles.date[k], closes[k]) == state['checkpoint_bar']
+
+        if reusable:
+            if n > len(state['buffer']):
+                state['buffer'] = np.concatenate((state['buffer'], np.empty_like(state['buffer'])))
+            buffer = state['buffer']
+            # Same per-window mean as `_calculate_sma`, for the two bars that may have moved
+            for i in range(max(n - 2, 0), n):
+                buffer[i] = closes[max(0, i + 1 - window):i + 1].mean()
+        else:
+            buffer = np.empty(2 * n, dtype=np.float64)
+            buffer[:n] = self._calculate_sma(closes[:n], window)
+            state = self._sma_state = {'buffer': buffer}
+        k = max(n - 2, 0)
+        state['checkpoint_bar'] = (candles.date[k], closes[k])
+        state['length'] = n
+        return buffer[:n]
+
+    @classmethod
+    def _decision_codes(cls, closes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (decision codes, SMA series) for a close series, one entry per bar.
+
+        Evaluates the same crossover rule as run() for the whole series at once; each
+        bar only depends on data up to itself.
+        """
+        sma_values = cls._calculate_sma(closes, SMA_WINDOW)
+        above, below = closes > sma_values, closes < sma_values
+        long_cross = above[1:] & ~above[:-1]  # prev_close <= prev_sma and close > sma
+        exit_cross = below[1:] & ~below[:-1]  # prev_close >= prev_sma and close < sma
+        entry_idx = np.flatnonzero(long_cross[WARMUP_BARS - 1:]) + WARMUP_BARS
+        exit_idx = np.flatnonzero(exit_cross[WARMUP_BARS - 1:]) + WARMUP_BARS
+        return _walk_crossovers(entry_idx, exit_idx, len(closes)), sma_values
+
+    @staticmethod
+    def batch_backtest(closes: np.ndarray, max_workers: int = None) -> np.ndarray:
+        """Return decision codes (indices into DECISIONS) for a (series, bars) matrix of closes.
+
+        Intended for multi-symbol or parameter sweeps over aligned, gap-free series. Rows
+        are independent and evaluated in parallel worker processes, each with the same
+        `_decision_codes` path as `backtest()`, so every row gets exactly the codes
+        `backtest()` computes for that series.
+        """
+        closes = np.asarray(closes, dtype=np.float64)
+        codes = np.zeros(closes.shape, dtype=np.int8)
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            for row, row_codes in enumerate(pool.map(_batch_row_codes, closes)):
+                codes[row] = row_codes
+        return codes
 
     def to_dict(self):
         return {
@@ -43,7 +175,7 @@ class SMACrossover(Strategy):
         logger.info("Refreshing strategy params...")
         self.params.open_orders = data_manager.get_open_orders()
         self.params.executed_orders = data_manager.get_completed_orders()
-        self.params.positions = data_manager.get_positions()
+        self.set_positions(data_manager.get_positions())
         self.params.contracts[0].data = data_manager.get_historical_data(self.params.contracts[0].contract, duration='3 M', bar_size=self.timeframe)
         logger.success("Successfully refreshed strategy params.")
 
@@ -59,16 +191,13 @@ class SMACrossover(Strategy):
             logger.error('No data available')
             return 'STAY'
 
-        if len(main_contract.data) < 201:
+        n = main_contract.length
+        if n <= WARMUP_BARS:
             logger.info('Not enough data for calculation')
             return 'STAY'
         
         # Calculate 50-period Simple Moving Average (SMA)
-        window = 50
-        sma_values = [
-            np.mean([d['close'] for d in main_contract.data[max(0, i - window):i]])
-            for i in range(1, len(main_contract.data) + 1)
-        ]
+        sma_values = self._update_sma(main_contract.data, n, SMA_WINDOW)
 
         # Save historical SMA values to indicators
         main_contract.indicators['sma'] = sma_values
@@ -78,13 +207,14 @@ class SMACrossover(Strategy):
         self.params.indicators['sma'] = sma
         prev_sma = sma_values[-2]
 
-        latest_close = main_contract.data[-1]['close']
-        prev_close = main_contract.data[-2]['close']
+        latest_close = main_contract.data.close[n - 1]
+        prev_close = main_contract.data.close[n - 2]
 
-        logger.info(
-            f"Latest close: {latest_close:.2f}, Prev close: {prev_close:.2f}, "
-            f"SMA: {sma:.2f}, Prev SMA: {prev_sma:.2f}"
-        )
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                f"Latest close: {latest_close:.2f}, Prev close: {prev_close:.2f}, "
+                f"SMA: {sma:.2f}, Prev SMA: {prev_sma:.2f}"
+            )
 
         has_position = self.has_open_position()
         # Entry condition: price crosses above SMA (bullish crossover)
@@ -106,90 +236,72 @@ class SMACrossover(Strategy):
 
         self.params.open_orders = []
         self.params.executed_orders = []
-        self.params.positions = []
+        self.set_positions([])
 
-        full_historical_data = self.params.contracts[0].data
+        main_contract = self.params.contracts[0]
+        full_historical_data = main_contract.data
         logger.info(f"Backtest will replay {len(full_historical_data)} candles.")
 
-        open_trade = None
         trades = []
-        decisions = []  # NEW: keep a record of every decision taken
-
-        # Iterate through each candle and progressively grow the data set that the strategy can see.
-        for idx, candle in enumerate(full_historical_data):
-
-            # The SMA-200 requires at least 201 price points (previous close + current close).
-            # Skip the initial period where we do not have enough data to evaluate a signal.
-            if idx < 200:
-                continue
-
-            # Provide the strategy only with data **up to** the current index so that run() "sees"
-            # market information as it would have been available on that day.
-            self.params.contracts[0].data = full_historical_data[: idx + 1]
-
-            # Execute the strategy on this truncated data set
-            decision = self.run()
-
-            # Record the decision for this candle
-            current_date = candle.get('date')
-            current_close = candle.get('close')
-            
-            decisions.append({
-                'date': current_date.strftime('%Y%m%d%H%M%S'),
-                'decision': decision
-            })
-
-            qty = getattr(self.params, 'number_of_contracts', 1)
-
-            if decision in ("LONG", "SHORT") and open_trade is None:
-                open_trade = TradeSnapshot(
-                    side=decision,
-                    qty=qty,
-                    entry_date=current_date,
-                    entry_price=current_close,
-                )
-                logger.info(
-                    f"Opened {decision} on {current_date} @ {current_close} ({qty} contracts)"
-                )
-                # Reflect open position in strategy params so that subsequent run() calls know
-                self.params.positions = [{'position': qty if decision == 'LONG' else -qty}]
-
-            elif decision == "EXIT" and open_trade is not None:
-                open_trade.close(current_date, current_close, "EXIT_SIGNAL")
-                trades.append(open_trade)
-                logger.info(f"Closed position on {current_date} @ {current_close}")
-                open_trade = None
-                self.params.positions = []
+
+        closes = full_historical_data.close
+        codes, sma_values = self._decision_codes(closes)
+        dates = full_historical_data.date
+        if len(sma_values):
+            main_contract.indicators['sma'] = sma_values  # listed only by ContractData.to_dict()
+            self.params.indicators['sma'] = float(sma_values[-1])
+
+        qty = getattr(self.params, 'number_of_contracts', 1)
+
+        # The walk alternates LONG and EXIT codes starting with a LONG, so the n-th exit closes
+        # the n-th entry; an entry without a matching exit is still open at the end of the data
+        entry_bars = np.flatnonzero(codes == 1).tolist()
+        exit_bars = np.flatnonzero(codes == 3).tolist()
+        log_trades = logger.isEnabledFor(logging.INFO)
+        for entry, exit_ in zip(entry_bars, exit_bars):
+            trade = TradeSnapshot(side='LONG', qty=qty, entry_date=dates[entry], entry_price=float(closes[entry]))
+            trade.close(dates[exit_], float(closes[exit_]), "EXIT_SIGNAL")
+            trades.append(trade)
+            if log_trades:
+                logger.info(f"Opened LONG on {trade.entry_date} @ {trade.entry_price} ({qty} contracts)")
+                logger.info(f"Closed position on {trade.exit_date} @ {trade.exit_price}")
+
+        # Materialize one record per replayed candle from the code array, formatting each
+        # date once here
+        decisions = [
+            {'date': date.strftime('%Y%m%d%H%M%S'), 'decision': DECISIONS[code]}
+            for date, code in zip(dates[WARMUP_BARS:].tolist(), codes[WARMUP_BARS:].tolist())
+        ]
 
         # Note: We no longer automatically close positions at the end of data
         # Any open positions will remain open in the final results
+        if len(entry_bars) > len(exit_bars):
+            self.set_positions([{'position': qty}])
 
         logger.success(f"Backtest generated {len(trades)} trades.")
         # Return both trades and full decision history
         return trades, decisions
 
     def create_orders(self, action: str):
-        
+
+        if action not in ('LONG', 'SHORT'):
+            logger.info(f'No order created for action: {action}')
+            return None
+
         main_contract = self.params.contracts[0]
         if not main_contract:
             logger.error('No data available for order creation')
             return None
         
-        main_contract_data = main_contract.data[-1]
+        n = main_contract.length
 
         qty = 10  # number of shares
-        entry_price = main_contract_data.get('close')
+        entry_price = float(main_contract.data.close[n - 1]) if n else None
         if entry_price is None:
             logger.error('Could not determine entry price')
             return None
 
-        if action == 'LONG':
-            order = MarketOrder(action='BUY', totalQuantity=qty)
-        elif action == 'SHORT':
-            order = MarketOrder(action='SELL', totalQuantity=qty)
-        else:
-            logger.info(f'No order created for action: {action}')
-            return None
+        order = MarketOrder(action='BUY' if action == 'LONG' else 'SELL', totalQuantity=qty)
 
         logger.info(f'Creating {action} market order for {qty} shares at approx {entry_price:.2f}')
         return [order]
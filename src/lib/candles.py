@@ -0,0 +1,100 @@
+import numpy as np
+from typing import List, Dict, Any, Iterator
+
+
+class Candles:
+    """Column-oriented (structure-of-arrays) container for OHLC bars.
+
+    Each field is stored in its own contiguous NumPy array so indicators can work
+    on whole columns (`candles.close`, `candles.high`, ...) without touching Python
+    dicts. Slicing returns views over the same arrays, and integer indexing or
+    iteration still yields per-bar dicts for code written against the former
+    list-of-dicts layout of `DataManager.get_historical_data`.
+    """
+
+    def __init__(self, date: np.ndarray, open: np.ndarray, high: np.ndarray, low: np.ndarray,
+                 close: np.ndarray, volume: np.ndarray, average: np.ndarray, bar_count: np.ndarray):
+        self.date = date  # object array of the original date / datetime values
+        self.open = open
+        self.high = high
+        self.low = low
+        self.close = close
+        self.volume = volume
+        self.average = average
+        self.bar_count = bar_count
+
+    @classmethod
+    def from_bars(cls, bars: List[Dict[str, Any]]) -> 'Candles':
+        """Build the column arrays from a list of bar dicts (e.g. `BarData.dict()`)"""
+        n = len(bars)
+
+        def column(field: str, dtype=np.float64, default=np.nan) -> np.ndarray:
+            return np.fromiter((bar.get(field, default) for bar in bars), dtype=dtype, count=n)
+
+        date = np.empty(n, dtype=object)
+        date[:] = [bar.get('date') for bar in bars]
+        return cls(
+            date=date,
+            open=column('open'),
+            high=column('high'),
+            low=column('low'),
+            close=column('close'),
+            volume=column('volume'),
+            average=column('average'),
+            bar_count=column('barCount', dtype=np.int64, default=0),
+        )
+
+    @classmethod
+    def from_bar_data(cls, bars) -> 'Candles':
+        """Build the column arrays straight from ib_insync `BarData` objects, without per-bar dicts"""
+        n = len(bars)
+
+        def column(field: str, dtype=np.float64) -> np.ndarray:
+            return np.fromiter((getattr(bar, field) for bar in bars), dtype=dtype, count=n)
+
+        date = np.empty(n, dtype=object)
+        date[:] = [bar.date for bar in bars]
+        return cls(
+            date=date,
+            open=column('open'),
+            high=column('high'),
+            low=column('low'),
+            close=column('close'),
+            volume=column('volume'),
+            average=column('average'),
+            bar_count=column('barCount', dtype=np.int64),
+        )
+
+    def __len__(self) -> int:
+        return len(self.close)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return Candles(
+                date=self.date[key],
+                open=self.open[key],
+                high=self.high[key],
+                low=self.low[key],
+                close=self.close[key],
+                volume=self.volume[key],
+                average=self.average[key],
+                bar_count=self.bar_count[key],
+            )
+        return {
+            'date': self.date[key],
+            'open': float(self.open[key]),
+            'high': float(self.high[key]),
+            'low': float(self.low[key]),
+            'close': float(self.close[key]),
+            'volume': float(self.volume[key]),
+            'average': float(self.average[key]),
+            'barCount': int(self.bar_count[key]),
+        }
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def to_list(self) -> List[Dict[str, Any]]:
+        """Return the bars as a list of dicts"""
+        return list(self)
@@ -1,14 +1,33 @@
 from ib_insync import *
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Union
+from src.lib.candles import Candles
+import numpy as np
 import datetime
 
 class ContractData:
     """Class to hold an IB contract and its associated historical market data"""
     
-    def __init__(self, contract: Contract, data: Optional[List[Dict[str, Any]]] = None):
+    def __init__(self, contract: Contract, data: Optional[Union[Candles, List[Dict[str, Any]]]] = None):
         self.contract = contract
-        self.data = data or []
+        self.data = data
         self.indicators = {}
+        # Number of leading bars visible to the strategy (None = all). Backtests
+        # advance this cursor instead of re-slicing `data` on every candle.
+        self.visible_len: Optional[int] = None
+
+    @property
+    def data(self) -> Candles:
+        return self._data
+
+    @data.setter
+    def data(self, bars: Optional[Union[Candles, List[Dict[str, Any]]]]):
+        # Bars are stored column-wise; lists of bar dicts are converted once here
+        self._data = bars if isinstance(bars, Candles) else Candles.from_bars(bars or [])
+
+    @property
+    def length(self) -> int:
+        """Number of bars currently visible to the strategy"""
+        return len(self.data) if self.visible_len is None else self.visible_len
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary representation"""
@@ -33,5 +52,9 @@ class ContractData:
             'contract': contract_info,
             'data': formatted_data,
             'symbol': self.contract.symbol,
-            'indicators': self.indicators,
+            # Indicator series may be NumPy arrays/views; lists are only built here
+            'indicators': {
+                name: values.tolist() if isinstance(values, np.ndarray) else values
+                for name, values in self.indicators.items()
+            },
         }
@@ -1,6 +1,5 @@
 from abc import ABC, abstractmethod
 from src.lib.params import BaseStrategyParams
-from abc import ABC, abstractmethod
 from ib_insync import *
 
 class Strategy(ABC):
@@ -8,6 +7,11 @@ class Strategy(ABC):
         self.params = initialParams
         self.timeframe = '1 day'
         self.timeframe_seconds = 86400
+        # Signed net position maintained by backtest() replays; None outside a replay
+        self._position_state = None
+        # Whether params.positions holds an open position and the direction of the first
+        # one ('long' / 'short' / None), both cached by set_positions()
+        self.set_positions(initialParams.positions)
     
     @abstractmethod
     def run(self):
@@ -34,9 +38,20 @@ class Strategy(ABC):
             'params': self.params.to_dict()
         }
 
+    def set_positions(self, positions):
+        """Assign params.positions and cache whether any of them is open (long or short)
+        and the direction of the first open one, in a single pass."""
+        self.params.positions = positions
+        self._position_direction = None
+        for pos in positions:
+            size = pos.get('position', 0)
+            if size:
+                self._position_direction = 'long' if size > 0 else 'short'
+                break
+        self._has_open_position = self._position_direction is not None
+
     def has_open_position(self):
         """Return True if any open position is currently held (long or short)."""
-        for pos in getattr(self.params, 'positions', []):
-            if abs(pos.get('position', 0)) > 0:
-                return True
-        return False
+        if self._position_state is not None:
+            return self._position_state != 0
+        return self._has_open_position
@@ -1,6 +1,20 @@
+from typing import Iterable, List, Dict, Any
+
+
+def _format_date(value):
+    """Serialize a date as an ISO string for JSON compatibility"""
+    if value is None:
+        return None
+    return value.isoformat() if hasattr(value, "isoformat") else str(value)
+
+
 class TradeSnapshot:
     """Represents a completed trade for backtest output"""
 
+    # Backtests create one per trade batch; slots drop the per-instance __dict__
+    __slots__ = ('side', 'qty', 'entry_date', 'entry_price', 'exit_date', 'exit_price', 'exit_reason',
+                 '_entry_date_str', '_exit_date_str', '_pnl_abs')
+
     def __init__(self, side: str, qty: int, entry_date, entry_price: float):
         self.side = side  # 'LONG' or 'SHORT'
         self.qty = qty
@@ -9,46 +23,52 @@ class TradeSnapshot:
         self.exit_date = None
         self.exit_price = None
         self.exit_reason = None  # TP / SL / EXIT_SIGNAL / END_OF_DATA
+        # Dates and PnL do not change once set, so they are formatted / computed once
+        # here and in close() instead of on every to_dict()
+        self._entry_date_str = _format_date(entry_date)
+        self._exit_date_str = None
+        self._pnl_abs = None
 
     def close(self, exit_date, exit_price: float, exit_reason: str = None):
         self.exit_date = exit_date
         self.exit_price = exit_price
         self.exit_reason = exit_reason
+        self._exit_date_str = _format_date(exit_date)
+        if exit_price is not None:
+            sign = 1 if self.side == 'LONG' else -1
+            self._pnl_abs = (exit_price - self.entry_price) * sign * self.qty
 
     @property
     def pnl_abs(self):
-        if self.exit_price is None:
-            return None
-        sign = 1 if self.side == 'LONG' else -1
-        return (self.exit_price - self.entry_price) * sign * self.qty
+        return self._pnl_abs
 
     @property
     def pnl_pct(self):
-        if self.pnl_abs is None:
+        if self._pnl_abs is None:
             return None
-        return self.pnl_abs / (self.entry_price * self.qty)
+        return self._pnl_abs / (self.entry_price * self.qty)
 
     def to_dict(self):
-        # Ensure dates are serialized as ISO strings for JSON compatibility
-        entry_date_str = (
-            self.entry_date.isoformat()
-            if hasattr(self.entry_date, "isoformat")
-            else str(self.entry_date)
-        )
-        exit_date_str = (
-            self.exit_date.isoformat()
-            if self.exit_date is not None and hasattr(self.exit_date, "isoformat")
-            else (str(self.exit_date) if self.exit_date is not None else None)
-        )
-
-        return {
-            'Side': self.side,
-            'Qty': self.qty,
-            'Entry Date': entry_date_str,
-            'Entry Price': self.entry_price,
-            'Exit Date': exit_date_str,
-            'Exit Price': self.exit_price,
-            'Exit Reason': self.exit_reason,
-            'PNL $': self.pnl_abs,
-            'PNL %': self.pnl_pct,
-        }
+        return self.many_to_records((self,))[0]
+
+    @staticmethod
+    def many_to_records(snaps: Iterable['TradeSnapshot']) -> List[Dict[str, Any]]:
+        """Serialize snapshots in one comprehension, equivalent to `[s.to_dict() for s in snaps]`.
+
+        Dates and PnL are read from the values cached at construction / close(), so no
+        per-snapshot method or property is dispatched.
+        """
+        return [
+            {
+                'Side': snap.side,
+                'Qty': snap.qty,
+                'Entry Date': snap._entry_date_str,
+                'Entry Price': snap.entry_price,
+                'Exit Date': snap._exit_date_str,
+                'Exit Price': snap.exit_price,
+                'Exit Reason': snap.exit_reason,
+                'PNL $': snap._pnl_abs,
+                'PNL %': None if snap._pnl_abs is None else snap._pnl_abs / (snap.entry_price * snap.qty),
+            }
+            for snap in snaps
+        ]
@@ -0,0 +1,28 @@
+"""Optional orjson support for Socket.IO payloads.
+
+`dumps` and `loads` match the standard library calls made by python-socketio
+(which passes `separators=`), so the module can be handed to `SocketIO(json=...)`.
+They fall back to the standard `json` module when orjson is not installed.
+"""
+
+import json
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+if HAS_ORJSON:
+    # NumPy scalars / arrays and non-string keys are encoded instead of rejected
+    _OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+    def dumps(obj, **kwargs) -> str:
+        # orjson output is always compact, so `separators` and friends are ignored
+        return orjson.dumps(obj, option=_OPTIONS).decode()
+
+    def loads(s, **kwargs):
+        return orjson.loads(s)
+else:
+    dumps = json.dumps
+    loads = json.loads
@@ -0,0 +1,19 @@
+"""Optional Numba support for numeric kernels.
+
+`njit` falls back to a pass-through decorator when numba is not
+installed, so decorated kernels still run (as plain Python) without it.
+"""
+
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+
+        def decorator(func):
+            return func
+        return decorator
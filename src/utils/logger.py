@@ -1,6 +1,7 @@
 from rich.logging import RichHandler
 from rich.console import Console
 from rich.theme import Theme
+from contextlib import contextmanager
 import logging
 import os
 
@@ -63,6 +64,23 @@ class Logger:
         logging.getLogger('pytz').setLevel(logging.ERROR)
         logging.getLogger('ib_insync').setLevel(logging.ERROR)
 
+    def isEnabledFor(self, level):
+        """Return True if a message at `level` would be emitted; use it to skip building hot-path messages"""
+        if self.dev_mode and level == logging.INFO:
+            # info() and success() are routed to DEBUG in development mode
+            level = logging.DEBUG
+        return self.logger.isEnabledFor(level)
+
+    @contextmanager
+    def quiet(self, level=logging.WARNING):
+        """Temporarily drop messages below `level`, e.g. while a backtest replays run()"""
+        previous = self.logger.level
+        self.logger.setLevel(level)
+        try:
+            yield
+        finally:
+            self.logger.setLevel(previous)
+
     def info(self, message):
         if self.dev_mode:
             self.logger.debug(f"[white]{message}[/white]", extra={'markup': True})
@@ -1,6 +1,7 @@
 from ib_insync import *
 from src.utils.logger import logger
 from src.utils.managers.connection_manager import ConnectionManager
+from src.lib.candles import Candles
 import math
 import time
 
@@ -24,7 +25,8 @@ class DataManager:
         async def _get():
             resp = self.ib.reqHistoricalData(contract, endDateTime='', durationStr=duration,
                                              barSizeSetting=bar_size, whatToShow='TRADES', useRTH=1)
-            return [bar.dict() for bar in resp]
+            # Convert to columns once at the ingest boundary; consumers never see bar dicts
+            return Candles.from_bar_data(resp)
 
         try:
             data = self.conn._execute(_get())